@@ -1,10 +1,13 @@
 
 import asyncio
+import hmac
+import html
 import logging
 import sqlite3
 from datetime import datetime, timedelta
 import re
 import random
+import time
 
 from aiogram import Dispatcher, F, Bot
 from aiogram.client.default import DefaultBotProperties
@@ -14,7 +17,7 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKe
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-
+from aiohttp import web
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -59,7 +62,19 @@ MANAGER_NAMES = {
     3: "Manager3"   # TODO: Имя менеджера 3
 }
 
+ADMIN_API_HOST = "127.0.0.1"
+ADMIN_API_PORT = 8080
+ADMIN_API_TOKEN = ""  # TODO: Токен для read-only админ-API (пусто — API выключен)
+
 KIEV_TZ = pytz.timezone("Europe/Kiev")
+
+class SystemClock:
+    """Текущее время для бота. Симуляция (simulate.py) подменяет его на ускоренные часы."""
+    def now(self) -> datetime:
+        return datetime.now(KIEV_TZ)
+
+clock = SystemClock()
+
 bot = Bot(token=API_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 storage = MemoryStorage()
 dp = Dispatcher(storage=storage)
@@ -89,7 +104,8 @@ def init_db():
         status TEXT,
         message_id INTEGER,
         source TEXT,
-        manager_num INTEGER
+        manager_num INTEGER,
+        due_ts REAL
     )
     """)
     conn.commit()
@@ -103,46 +119,81 @@ def init_db():
             logger.info("Столбец 'manager_num' успешно добавлен.")
         else:
             logger.debug("Столбец 'manager_num' уже существует в таблице 'tasks'.")
+        if "due_ts" not in columns:
+            logger.info("Столбец 'due_ts' отсутствует. Добавляем и заполняем по уже созданным задачам...")
+            c.execute("ALTER TABLE tasks ADD COLUMN due_ts REAL")
+            # deadline у старых задач — уже время следующего напоминания, поэтому первый срок восстанавливаем:
+            # /rem, по которому уже пришло напоминание, считаем просроченной с момента миграции,
+            # остальные — по времени создания из task_id плюс интервал напоминания
+            migration_ts = clock.now().timestamp()
+            c.execute("SELECT task_id, source, next_reminder_delta, deadline, message_id FROM tasks WHERE deadline IS NOT NULL")
+            for task_id, source, next_reminder_delta, deadline_str, message_id in c.fetchall():
+                due_ts = datetime.fromisoformat(deadline_str).timestamp()
+                if source == "manager_rem":
+                    if message_id is not None:
+                        due_ts = min(due_ts, migration_ts)
+                else:
+                    try:
+                        created_ts = float(task_id.split("_")[1])
+                        due_ts = min(due_ts, created_ts + (next_reminder_delta or 0) * 60)
+                    except (IndexError, ValueError):
+                        pass
+                c.execute("UPDATE tasks SET due_ts = ? WHERE task_id = ?", (due_ts, task_id))
+            conn.commit()
+            logger.info("Столбец 'due_ts' успешно добавлен.")
+        # Индексы под /tasks и админ-API: фильтры всегда идут по активным задачам
+        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_manager ON tasks(status, manager_num, task_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_source ON tasks(status, source, task_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due_ts)")
+        conn.commit()
     except sqlite3.Error as e:
         logger.error(f"Ошибка при проверке/модификации таблицы 'tasks': {e}")
     conn.close()
     logger.info("База данных (tasks.db) инициализирована (структура проверена/обновлена).")
 
 
+TASK_COLUMNS = ("task_id, chat_id, type, file_id, text_, caption, next_reminder_delta, "
+                "deadline, status, message_id, source, manager_num, due_ts")
+
 def save_task_to_db(task_id: str, data: dict):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     deadline_str = data["deadline"].isoformat() if data["deadline"] else None
-    c.execute("""
+    # due_ts — первый назначенный срок задачи, дальше он не сдвигается вместе с напоминаниями
+    if data.get("due_ts") is None and data["deadline"]:
+        data["due_ts"] = data["deadline"].timestamp()
+    c.execute(f"""
     INSERT OR REPLACE INTO tasks 
-    (task_id, chat_id, type, file_id, text_, caption, next_reminder_delta, deadline, status, message_id, source, manager_num)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ({TASK_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         task_id, data["chat_id"], data["type"], data["file_id"], data["text"],
         data["caption"], data["next_reminder_delta"], deadline_str, data["status"],
-        data["message_id"], data["source"], data.get("manager_num")
+        data["message_id"], data["source"], data.get("manager_num"), data.get("due_ts")
     ))
     conn.commit()
     conn.close()
+    _tasks_query_cache.clear()
     logger.debug(f"Задача {task_id} сохранена/обновлена в БД.")
 
+def _row_to_task(row_data) -> tuple:
+    (task_id, chat_id, type_, file_id, text_, caption,
+     next_reminder_delta, deadline_str, status, message_id, source, manager_num, due_ts) = row_data
+    deadline = datetime.fromisoformat(deadline_str) if deadline_str else None
+    return task_id, {
+        "chat_id": chat_id, "type": type_, "file_id": file_id, "text": text_,
+        "caption": caption, "next_reminder_delta": next_reminder_delta,
+        "deadline": deadline, "status": status, "message_id": message_id,
+        "source": source, "manager_num": manager_num, "due_ts": due_ts
+    }
+
 def load_tasks_from_db() -> dict:
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute("SELECT task_id, chat_id, type, file_id, text_, caption, next_reminder_delta, deadline, status, message_id, source, manager_num FROM tasks")
+    c.execute(f"SELECT {TASK_COLUMNS} FROM tasks")
     rows = c.fetchall()
     conn.close()
-    tasks = {}
-    for row_data in rows:
-        (task_id, chat_id, type_, file_id, text_, caption,
-         next_reminder_delta, deadline_str, status, message_id, source, manager_num) = row_data
-        deadline = datetime.fromisoformat(deadline_str) if deadline_str else None
-        tasks[task_id] = {
-            "chat_id": chat_id, "type": type_, "file_id": file_id, "text": text_,
-            "caption": caption, "next_reminder_delta": next_reminder_delta,
-            "deadline": deadline, "status": status, "message_id": message_id,
-            "source": source, "manager_num": manager_num
-        }
+    tasks = dict(_row_to_task(row_data) for row_data in rows)
     logger.info(f"Загружено задач из БД: {len(tasks)}")
     return tasks
 
@@ -152,18 +203,142 @@ def delete_task_from_db(task_id: str):
     c.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
     conn.commit()
     conn.close()
+    _tasks_query_cache.clear()
     logger.debug(f"Задача {task_id} удалена из БД.")
 
+TASKS_PAGE_SIZE = 10
+TASKS_QUERY_CACHE_TTL = 10  # секунд
+TASKS_QUERY_CACHE_MAX_SIZE = 256
+_tasks_query_cache = {}
+
+# Группы источников для фильтров: всё, кроме owner и manager_rem, создаётся по расписанию
+TASK_SOURCE_FILTERS = {
+    "owner": "От владельца",
+    "manager_rem": "Личные /rem",
+    "scheduled": "По расписанию",
+}
+
+def query_active_tasks(manager_num: int = None, source: str = None, overdue_only: bool = False,
+                       cursor: str = None, limit: int = TASKS_PAGE_SIZE) -> tuple:
+    """Страница активных задач по индексам (keyset по task_id) и курсор следующей страницы."""
+    cache_key = (manager_num, source, overdue_only, cursor, limit)
+    cached = _tasks_query_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    conditions = ["status = 'active'"]
+    params = []
+    if manager_num is not None:
+        conditions.append("manager_num = ?")
+        params.append(manager_num)
+    if source == "scheduled":
+        conditions.append("source NOT IN ('owner', 'manager_rem')")
+    elif source:
+        conditions.append("source = ?")
+        params.append(source)
+    if overdue_only:
+        conditions.append("due_ts <= ?")
+        params.append(clock.now().timestamp())
+    if cursor:
+        conditions.append("task_id > ?")
+        params.append(cursor)
+    params.append(limit + 1)
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE {' AND '.join(conditions)} ORDER BY task_id LIMIT ?", params)
+    rows = c.fetchall()
+    conn.close()
+
+    tasks = [_row_to_task(row_data) for row_data in rows[:limit]]
+    next_cursor = tasks[-1][0] if len(rows) > limit else None
+    result = (tasks, next_cursor)
+    now_monotonic = time.monotonic()
+    for key, (expires_at, _) in list(_tasks_query_cache.items()):
+        if expires_at <= now_monotonic:
+            del _tasks_query_cache[key]
+    if len(_tasks_query_cache) >= TASKS_QUERY_CACHE_MAX_SIZE:
+        _tasks_query_cache.clear()
+    _tasks_query_cache[cache_key] = (now_monotonic + TASKS_QUERY_CACHE_TTL, result)
+    return result
+
 scheduler = AsyncIOScheduler(timezone=KIEV_TZ)
 tasks_dict = {}
 
 def generate_task_id() -> str:
-    return f"task_{datetime.now(KIEV_TZ).timestamp()}_{random.randint(1000,9999)}"
+    while True:
+        task_id = f"task_{clock.now().timestamp()}_{random.randint(1000,9999)}"
+        if task_id not in tasks_dict:
+            return task_id
 
 def make_done_keyboard(task_id: str) -> InlineKeyboardMarkup:
     button = InlineKeyboardButton(text="Выполнено", callback_data=f"done:{task_id}")
     return InlineKeyboardMarkup(inline_keyboard=[[button]])
 
+REMINDER_PREFIX = "‼️ Напоминание ‼️\n"
+
+def render_task_payload(task_id: str, task: dict) -> dict:
+    """Готовит текст/подпись для первой отправки и напоминаний, клавиатуру и сводку для владельца."""
+    manager_num = task.get("manager_num")
+    manager_name = MANAGER_NAMES.get(manager_num, f"Менеджер {manager_num}")
+    msg_type = task["type"]
+
+    new_prefix = ""
+    reminder_prefix = REMINDER_PREFIX
+    if task["source"] == "owner" and manager_num:
+        new_prefix = f"🔔 Новая Задача для {html.escape(manager_name)} 🔔\n"
+        reminder_prefix = new_prefix + REMINDER_PREFIX
+    elif task["source"] != "owner":
+        new_prefix = "🔔 Новая задача 🔔\n"
+
+    if msg_type == "text":
+        body = task["text"]
+    elif msg_type in ("photo", "document", "video"):
+        body = task["caption"] or ""
+    else:
+        body = f"\n[Тип {msg_type} не обрабатывается подробно]\n" + (task["text"] or "")
+
+    owner_summary = None
+    if task["source"] == "owner":
+        content_summary = task.get("text", "") if msg_type == "text" else task.get("caption", "")
+        if not content_summary and msg_type != "text": content_summary = f"({msg_type})"
+        elif not content_summary: content_summary = "(пустое сообщение)"
+
+        if manager_num is not None:
+            owner_task_prefix = f"🔔 Задача от Владельца для {manager_name} 🔔\n"
+            if content_summary.startswith(owner_task_prefix):
+                content_summary = content_summary.replace(owner_task_prefix, "", 1)
+            if content_summary.startswith(REMINDER_PREFIX):
+                content_summary = content_summary.replace(REMINDER_PREFIX, "", 1).strip()
+
+        max_len = 200
+        if len(content_summary) > max_len: content_summary = content_summary[:max_len-3] + "..."
+        completed_by_manager_name = html.escape(manager_name) if manager_num is not None else "Неизвестный менеджер"
+        owner_summary = f"✅ {completed_by_manager_name} выполнила задачу:\n{content_summary}"
+
+    return {
+        "new": new_prefix + body,
+        "reminder": reminder_prefix + body,
+        "keyboard": make_done_keyboard(task_id),
+        "owner_summary": owner_summary,
+    }
+
+def cache_task_payload(task_id: str) -> dict:
+    # Payload живёт рядом с задачей в tasks_dict и не меняется между напоминаниями
+    task = tasks_dict[task_id]
+    payload = task.get("payload")
+    if payload is None:
+        payload = task["payload"] = render_task_payload(task_id, task)
+    return payload
+
+def rename_manager(manager_num: int, new_name: str):
+    MANAGER_NAMES[manager_num] = new_name
+    invalidated = 0
+    for task in tasks_dict.values():
+        if task.get("manager_num") == manager_num and task.pop("payload", None) is not None:
+            invalidated += 1
+    logger.info(f"Менеджер №{manager_num} переименован в {new_name}, сброшено кэшированных сообщений: {invalidated}.")
+
 async def schedule_reminder(task_id: str, reminder_minutes: int = None):
     task = tasks_dict.get(task_id)
     if not task or task["status"] != "active":
@@ -176,13 +351,13 @@ async def schedule_reminder(task_id: str, reminder_minutes: int = None):
     if reminder_minutes == 0 and task["source"] not in ["manager_rem", "owner"]:
          reminder_minutes = task["next_reminder_delta"]
 
-    when = datetime.now(tz=KIEV_TZ) + timedelta(minutes=reminder_minutes)
+    when = clock.now() + timedelta(minutes=reminder_minutes)
     tasks_dict[task_id]["deadline"] = when
     save_task_to_db(task_id, tasks_dict[task_id])
     logger.info(f"Следующее напоминание для задачи {task_id} запланировано на {when.strftime('%Y-%m-%d %H:%M:%S %Z')}")
 
 async def check_tasks():
-    now = datetime.now(tz=KIEV_TZ)
+    now = clock.now()
     for task_id, data in list(tasks_dict.items()):
         if data["status"] == "active" and data["deadline"] and data["deadline"] <= now:
             logger.info(f"Задача {task_id} для чата {data['chat_id']} просрочена. Дедлайн: {data['deadline'].strftime('%Y-%m-%d %H:%M:%S %Z')}")
@@ -222,34 +397,21 @@ async def send_task_message(task_id: str, reminder=False):
     chat_id = task["chat_id"]
     msg_type = task["type"]
     file_id = task["file_id"]
-    kb = make_done_keyboard(task_id)
-    
-    prefix_text = "‼️ Напоминание ‼️\n" if reminder else ""
-
-    if task["source"] == "owner" and task.get("manager_num"):
-        manager_num = task.get("manager_num")
-        manager_name = MANAGER_NAMES.get(manager_num, f"Менеджер {manager_num}")
-        prefix_text = f"🔔 Новая Задача для {manager_name} 🔔\n{prefix_text}"
-    elif task["source"] != "owner" and not reminder :
-         prefix_text = "🔔 Новая задача 🔔\n"
-    
-    text_to_send = prefix_text
+    payload = cache_task_payload(task_id)
+    kb = payload["keyboard"]
+    text_to_send = payload["reminder"] if reminder else payload["new"]
 
     try:
         if msg_type == "text":
-            text_to_send += task["text"]
             msg = await bot.send_message(chat_id, text_to_send, reply_markup=kb)
+        elif msg_type == "photo":
+            msg = await bot.send_photo(chat_id=chat_id, photo=file_id, caption=text_to_send, reply_markup=kb)
+        elif msg_type == "document":
+            msg = await bot.send_document(chat_id=chat_id, document=file_id, caption=text_to_send, reply_markup=kb)
+        elif msg_type == "video":
+            msg = await bot.send_video(chat_id=chat_id, video=file_id, caption=text_to_send, reply_markup=kb)
         else:
-            caption_to_send = text_to_send + (task["caption"] or "")
-            if msg_type == "photo":
-                msg = await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption_to_send, reply_markup=kb)
-            elif msg_type == "document":
-                msg = await bot.send_document(chat_id=chat_id, document=file_id, caption=caption_to_send, reply_markup=kb)
-            elif msg_type == "video":
-                msg = await bot.send_video(chat_id=chat_id, video=file_id, caption=caption_to_send, reply_markup=kb)
-            else:
-                text_to_send += f"\n[Тип {msg_type} не обрабатывается подробно]\n" + (task["text"] or "")
-                msg = await bot.send_message(chat_id=chat_id, text=text_to_send, reply_markup=kb)
+            msg = await bot.send_message(chat_id=chat_id, text=text_to_send, reply_markup=kb)
         
         logger.info(f"Отправлено {'напоминание' if reminder else 'сообщение'} для задачи {task_id} в чат {chat_id}. Тип: {msg_type}.")
         return msg
@@ -280,7 +442,7 @@ async def cmd_start(message: Message):
     manager_list_str_parts = []
     for num in sorted(MANAGER_IDS.keys()): 
         name = MANAGER_NAMES.get(num, f"Менеджер {num}")
-        manager_list_str_parts.append(f"  - {name}") 
+        manager_list_str_parts.append(f"  - {html.escape(name)}") 
     manager_list_for_start = "\n".join(manager_list_str_parts)
     if not manager_list_for_start:
         manager_list_for_start = "  (Менеджеры не настроены)"
@@ -296,12 +458,15 @@ async def cmd_start(message: Message):
         "   <code>/rem [описание] [HH:MM]</code> (сегодня или завтра, если время прошло)\n"
         "   <code>/rem [описание] [DD.MM] [HH:MM]</code> (конкретная дата и время)\n"
         "В указанное время придёт напоминание, потом каждые 30 минут, пока не нажать «Выполнено».\n\n"
+        "3) Владелец может посмотреть открытые задачи:\n"
+        "   <code>/tasks [номер менеджера] [owner|rem|scheduled] [overdue]</code>\n"
+        "   и переименовать менеджера: <code>/rename [номер менеджера] [новое имя]</code>\n\n"
     )
 
     manager_1_name = MANAGER_NAMES.get(1, "Менеджер 1")
     if 1 in MANAGER_IDS: # Показываем блок только если менеджер 1 настроен
         text += (
-            f"<b>Для {manager_1_name}:</b>\n"
+            f"<b>Для {html.escape(manager_1_name)}:</b>\n"
             " - 15 число и последний день месяца\n"
             " - Понедельник 10:00\n"
             " - Суббота 19:00 и 19:30\n\n"
@@ -315,7 +480,7 @@ async def cmd_start(message: Message):
     if 3 in MANAGER_IDS and m3_name: m2_m3_names_list.append(m3_name)
     
     if m2_m3_names_list:
-        m2_m3_display_name = " и ".join(m2_m3_names_list)
+        m2_m3_display_name = " и ".join(html.escape(name) for name in m2_m3_names_list)
         text += (
             f"<b>Для {m2_m3_display_name} (ежемесячно):</b>\n"
             " - 1 число: Запушить клиентов на оплаты, выставить счета.\n"
@@ -330,6 +495,102 @@ async def cmd_start(message: Message):
     await message.answer(text)
     logger.info(f"/start от пользователя {message.from_user.id}")
 
+_TASKS_SOURCE_CODES = {"a": None, "o": "owner", "r": "manager_rem", "s": "scheduled"}
+
+def _tasks_callback_data(manager_num: int, source: str, overdue_only: bool, cursor: str = None) -> str:
+    source_code = next(code for code, value in _TASKS_SOURCE_CODES.items() if value == source)
+    return f"tasks:{manager_num or 0}:{source_code}:{int(overdue_only)}:{cursor or ''}"
+
+def build_tasks_page(manager_num: int = None, source: str = None, overdue_only: bool = False, cursor: str = None):
+    tasks, next_cursor = query_active_tasks(manager_num, source, overdue_only, cursor)
+    now_ts = clock.now().timestamp()
+
+    filters = [MANAGER_NAMES.get(manager_num, f"Менеджер {manager_num}") if manager_num else "все менеджеры",
+               TASK_SOURCE_FILTERS.get(source, "все источники").lower()]
+    if overdue_only:
+        filters.append("только просроченные")
+    lines = [f"📋 <b>Открытые задачи</b> ({html.escape(', '.join(filters))})"]
+    if not tasks:
+        lines.append("\nНичего не найдено.")
+    for task_id, task in tasks:
+        manager_name = MANAGER_NAMES.get(task["manager_num"], f"Менеджер {task['manager_num']}")
+        preview = (task["text"] if task["type"] == "text" else task["caption"]) or f"({task['type']})"
+        if len(preview) > 80: preview = preview[:77] + "..."
+        due_str = datetime.fromtimestamp(task["due_ts"], KIEV_TZ).strftime('%d.%m %H:%M') if task["due_ts"] else "—"
+        overdue_mark = " ⏰" if task["due_ts"] and task["due_ts"] <= now_ts else ""
+        lines.append(f"\n• <b>{html.escape(manager_name)}</b> · {html.escape(task['source'])} · срок {due_str}{overdue_mark}\n"
+                     f"  {html.escape(preview)}")
+
+    manager_buttons = [InlineKeyboardButton(text=("• " if not manager_num else "") + "Все",
+                                            callback_data=_tasks_callback_data(None, source, overdue_only))]
+    for num in sorted(MANAGER_IDS.keys()):
+        name = MANAGER_NAMES.get(num, f"Менеджер {num}")
+        manager_buttons.append(InlineKeyboardButton(text=("• " if num == manager_num else "") + name,
+                                                    callback_data=_tasks_callback_data(num, source, overdue_only)))
+    source_buttons = [InlineKeyboardButton(text=("• " if value == source else "") + TASK_SOURCE_FILTERS.get(value, "Все"),
+                                           callback_data=_tasks_callback_data(manager_num, value, overdue_only))
+                      for value in _TASKS_SOURCE_CODES.values()]
+    keyboard_rows = [manager_buttons[i:i + 2] for i in range(0, len(manager_buttons), 2)]
+    keyboard_rows += [source_buttons[i:i + 2] for i in range(0, len(source_buttons), 2)]
+    keyboard_rows.append([InlineKeyboardButton(text=("✅ " if overdue_only else "") + "Только просроченные",
+                                               callback_data=_tasks_callback_data(manager_num, source, not overdue_only))])
+    nav_buttons = []
+    if cursor:
+        nav_buttons.append(InlineKeyboardButton(text="⏮ В начало", callback_data=_tasks_callback_data(manager_num, source, overdue_only)))
+    if next_cursor:
+        nav_buttons.append(InlineKeyboardButton(text="Далее ▶️", callback_data=_tasks_callback_data(manager_num, source, overdue_only, next_cursor)))
+    if nav_buttons:
+        keyboard_rows.append(nav_buttons)
+
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
+
+@dp.message(Command("tasks"), F.chat.id == OWNER_ID)
+async def cmd_tasks(message: Message, state: FSMContext):
+    await state.clear()
+    manager_num = None
+    source = None
+    overdue_only = False
+    for arg in message.text.split()[1:]:
+        arg = arg.lower()
+        if arg.isdigit() and int(arg) in MANAGER_IDS:
+            manager_num = int(arg)
+        elif arg in ("overdue", "просрочено", "просроченные"):
+            overdue_only = True
+        elif arg in ("owner", "scheduled"):
+            source = arg
+        elif arg in ("rem", "manager_rem"):
+            source = "manager_rem"
+        else:
+            return await message.answer(
+                "❌ Не понял фильтр. Формат: <code>/tasks [номер менеджера] [owner|rem|scheduled] [overdue]</code>")
+
+    text, keyboard = build_tasks_page(manager_num, source, overdue_only)
+    await message.answer(text, reply_markup=keyboard)
+    logger.info(f"/tasks от владельца: менеджер={manager_num}, источник={source}, просроченные={overdue_only}")
+
+@dp.callback_query(F.data.startswith("tasks:"), F.from_user.id == OWNER_ID)
+async def tasks_page_callback(callback: CallbackQuery):
+    _, manager_str, source_code, overdue_str, cursor = callback.data.split(":", 4)
+    text, keyboard = build_tasks_page(int(manager_str) or None, _TASKS_SOURCE_CODES.get(source_code),
+                                      overdue_str == "1", cursor or None)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    except Exception as e:
+        logger.debug(f"Не удалось обновить список задач: {e}")
+    await callback.answer()
+
+@dp.message(Command("rename"), F.chat.id == OWNER_ID)
+async def cmd_rename_manager(message: Message, state: FSMContext):
+    await state.clear()
+    parts = message.text.split(maxsplit=2)
+    if len(parts) < 3 or not parts[1].isdigit() or int(parts[1]) not in MANAGER_IDS:
+        return await message.answer("❌ Формат: <code>/rename [номер менеджера] [новое имя]</code>")
+    manager_num = int(parts[1])
+    new_name = parts[2].strip()
+    rename_manager(manager_num, new_name)
+    await message.answer(f"✅ Менеджер №{manager_num} теперь {html.escape(new_name)}. "
+                         f"Чтобы имя сохранилось после перезапуска, поправьте MANAGER_NAMES.")
+
 @dp.message(F.chat.id == OWNER_ID, ~CommandStart())
 async def from_owner_handler(message: Message, state: FSMContext):
     extracted_data = extract_message_data(message)
@@ -375,6 +636,7 @@ async def owner_assigns_to_manager_callback(callback: CallbackQuery, state: FSMC
         "deadline": None, "status": "active", "message_id": None, "source": "owner",
         "manager_num": manager_num
     }
+    cache_task_payload(task_id)
     save_task_to_db(task_id, tasks_dict[task_id])
     msg = await send_task_message(task_id, reminder=False) 
     if msg:
@@ -382,7 +644,7 @@ async def owner_assigns_to_manager_callback(callback: CallbackQuery, state: FSMC
         save_task_to_db(task_id, tasks_dict[task_id])
     await schedule_reminder(task_id, 30) 
     
-    await callback.message.edit_text(f"✅ Отправлено {manager_name}.")
+    await callback.message.edit_text(f"✅ Отправлено {html.escape(manager_name)}.")
     await callback.answer()
     logger.info(f"Владелец назначил задачу {task_id} менеджеру {manager_name} (№{manager_num}, ID: {target_manager_chat_id}).")
 
@@ -416,7 +678,7 @@ async def manager_reminder_handler(message: Message):
         return await message.answer("❌ Описание задачи не может быть пустым.")
 
     try:
-        now = datetime.now(KIEV_TZ)
+        now = clock.now()
         year = now.year
         hours, minutes = map(int, time_str.split(':'))
         if not (0 <= hours <= 23 and 0 <= minutes <= 59):
@@ -448,6 +710,7 @@ async def manager_reminder_handler(message: Message):
         "next_reminder_delta": 30, "deadline": target_time, "status": "active",
         "message_id": None, "source": "manager_rem", "manager_num": current_manager_num
     }
+    cache_task_payload(task_id)
     save_task_to_db(task_id, tasks_dict[task_id])
     manager_name_for_log = MANAGER_NAMES.get(current_manager_num, f"Менеджер {current_manager_num}")
     await message.answer(f"✅ Напоминание установлено на {target_time.strftime('%d.%m.%Y %H:%M %Z')}")
@@ -462,6 +725,7 @@ async def _create_scheduled_task_for_manager(manager_chat_id: int, manager_num:
         "deadline": None, "status": "active", "message_id": None,
         "source": source, "manager_num": manager_num
     }
+    cache_task_payload(task_id)
     save_task_to_db(task_id, tasks_dict[task_id])
     logger.info(f"Создана scheduled задача {task_id} для менеджера {manager_name} (№{manager_num}, ID: {manager_chat_id}), текст: {reminder_text}")
     msg = await send_task_message(task_id, reminder=False)
@@ -497,6 +761,7 @@ async def done_task_handler(callback: CallbackQuery):
     task_status_before_del = task["status"]
     task_source_before_del = task["source"]
     task_manager_num_before_del = task.get("manager_num")
+    owner_summary = cache_task_payload(task_id)["owner_summary"]
 
     delete_task_from_db(task_id) 
     if task_id in tasks_dict:
@@ -509,33 +774,9 @@ async def done_task_handler(callback: CallbackQuery):
     logger.info(f"Задача {task_id} завершена менеджером {manager_name_for_log}.")
 
     if task_source_before_del == "owner":
-        original_text = task.get("text", "") 
-        original_caption = task.get("caption", "")
-        
-        content_summary = original_text if task.get("type") == "text" else original_caption
-        if not content_summary and task.get("type") != "text": content_summary = f"({task.get('type')})"
-        elif not content_summary: content_summary = "(пустое сообщение)"
-        
-        if task_manager_num_before_del is not None:
-            manager_name_for_prefix = MANAGER_NAMES.get(task_manager_num_before_del, f"Менеджер {task_manager_num_before_del}")
-            owner_task_prefix = f"🔔 Задача от Владельца для {manager_name_for_prefix} 🔔\n"
-            if content_summary.startswith(owner_task_prefix):
-                content_summary = content_summary.replace(owner_task_prefix, "", 1)
-            # Также удалим префикс напоминания, если он есть
-            reminder_prefix = "‼️ Напоминание ‼️\n"
-            if content_summary.startswith(reminder_prefix):
-                content_summary = content_summary.replace(reminder_prefix, "", 1).strip()
-
-
-        max_len = 200
-        if len(content_summary) > max_len: content_summary = content_summary[:max_len-3] + "..."
-        
-        completed_by_manager_name = MANAGER_NAMES.get(task_manager_num_before_del, f"Менеджер {task_manager_num_before_del}") \
-            if task_manager_num_before_del is not None else "Неизвестный менеджер"
-
         try:
-            await bot.send_message(OWNER_ID, f"✅ {completed_by_manager_name} выполнила задачу:\n{content_summary}")
-            logger.info(f"Уведомили владельца ({OWNER_ID}) о выполнении задачи {task_id} менеджером {completed_by_manager_name}.")
+            await bot.send_message(OWNER_ID, owner_summary)
+            logger.info(f"Уведомили владельца ({OWNER_ID}) о выполнении задачи {task_id} менеджером {manager_name_for_log}.")
         except Exception as e:
             logger.error(f"Не удалось уведомить владельца ({OWNER_ID}): {e}")
 
@@ -575,7 +816,7 @@ async def send_monday_morning_reminder():
         logger.warning(f"{manager_name} не найден в MANAGER_IDS для понедельничного напоминания.")
 
 async def check_monthly_dates():
-    now = datetime.now(KIEV_TZ)
+    now = clock.now()
     day = now.day
     month = now.month
     year = now.year
@@ -642,13 +883,77 @@ async def check_monthly_dates():
                 logger.info(f"Создание ежемесячной задачи для {data['name']}: {text_msg_m23}")
                 await _create_scheduled_task_for_manager(data['id'], num, text_msg_m23, source_m23)
 
+ # Read-only админ-API
+admin_api_runner = None
+
+def _serialize_task(task_id: str, task: dict) -> dict:
+    return {
+        "task_id": task_id, "chat_id": task["chat_id"], "type": task["type"],
+        "text": task["text"], "caption": task["caption"], "status": task["status"],
+        "source": task["source"], "manager_num": task["manager_num"],
+        "manager_name": MANAGER_NAMES.get(task["manager_num"]),
+        "deadline": task["deadline"].isoformat() if task["deadline"] else None,
+        "due": datetime.fromtimestamp(task["due_ts"], KIEV_TZ).isoformat() if task["due_ts"] else None,
+    }
+
+@web.middleware
+async def admin_api_auth_middleware(request: web.Request, handler):
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {ADMIN_API_TOKEN}".encode()):
+        return web.json_response({"error": "unauthorized"}, status=401)
+    return await handler(request)
+
+async def api_tasks_handler(request: web.Request):
+    query = request.query
+    try:
+        manager_num = int(query["manager"]) if query.get("manager") else None
+        limit = min(int(query.get("limit", TASKS_PAGE_SIZE)), 100)
+        if limit < 1:
+            raise ValueError("limit должен быть положительным")
+    except ValueError as e:
+        return web.json_response({"error": f"bad parameter: {e}"}, status=400)
+    source = query.get("source") or None
+    if source == "rem":
+        source = "manager_rem"
+    if source is not None and source not in TASK_SOURCE_FILTERS:
+        return web.json_response({"error": f"bad parameter: source должен быть одним из {', '.join(TASK_SOURCE_FILTERS)}"}, status=400)
+    overdue_only = query.get("overdue", "").lower() in ("1", "true", "yes")
+
+    tasks, next_cursor = query_active_tasks(manager_num, source, overdue_only, query.get("cursor") or None, limit)
+    return web.json_response(
+        {"tasks": [_serialize_task(task_id, task) for task_id, task in tasks], "next_cursor": next_cursor},
+        headers={"Cache-Control": f"private, max-age={TASKS_QUERY_CACHE_TTL}"},
+    )
+
+async def api_managers_handler(request: web.Request):
+    managers = [{"num": num, "name": MANAGER_NAMES.get(num, f"Менеджер {num}")} for num in sorted(MANAGER_IDS.keys())]
+    return web.json_response({"managers": managers, "sources": TASK_SOURCE_FILTERS})
+
+async def start_admin_api():
+    global admin_api_runner
+    app = web.Application(middlewares=[admin_api_auth_middleware])
+    app.router.add_get("/api/tasks", api_tasks_handler)
+    app.router.add_get("/api/managers", api_managers_handler)
+    admin_api_runner = web.AppRunner(app)
+    await admin_api_runner.setup()
+    await web.TCPSite(admin_api_runner, ADMIN_API_HOST, ADMIN_API_PORT).start()
+    logger.info(f"Админ-API запущено на http://{ADMIN_API_HOST}:{ADMIN_API_PORT}")
+
  # Настройка планировщика задач
+CHECK_TASKS_INTERVAL_SECONDS = 30
+
+def get_cron_jobs() -> list:
+    # Общий список пресетов для APScheduler и для simulate.py
+    return [
+        (send_monday_morning_reminder, CronTrigger(day_of_week="mon", hour=10, minute=0, timezone=KIEV_TZ)),
+        (send_saturday_morning_reminder, CronTrigger(day_of_week="sat", hour=19, minute=0, timezone=KIEV_TZ)),
+        (send_saturday_second_reminder, CronTrigger(day_of_week="sat", hour=19, minute=30, timezone=KIEV_TZ)),
+        (check_monthly_dates, CronTrigger(hour=10, minute=1, timezone=KIEV_TZ)),
+    ]
+
 def setup_scheduler():
-    scheduler.add_job(send_monday_morning_reminder, CronTrigger(day_of_week="mon", hour=10, minute=0, timezone=KIEV_TZ))
-    scheduler.add_job(send_saturday_morning_reminder, CronTrigger(day_of_week="sat", hour=19, minute=0, timezone=KIEV_TZ))
-    scheduler.add_job(send_saturday_second_reminder, CronTrigger(day_of_week="sat", hour=19, minute=30, timezone=KIEV_TZ))
-    scheduler.add_job(check_tasks, 'interval', seconds=30, timezone=KIEV_TZ, id="check_tasks_job")
-    scheduler.add_job(check_monthly_dates, CronTrigger(hour=10, minute=1, timezone=KIEV_TZ))
+    for job_func, trigger in get_cron_jobs():
+        scheduler.add_job(job_func, trigger)
+    scheduler.add_job(check_tasks, 'interval', seconds=CHECK_TASKS_INTERVAL_SECONDS, timezone=KIEV_TZ, id="check_tasks_job")
     logger.info("Задачи APScheduler настроены.")
 
  # Старт бота
@@ -660,7 +965,7 @@ async def on_startup():
     tasks_dict.update(loaded_tasks)
     logger.info(f"Загружено {len(tasks_dict)} задач из БД.")
 
-    now = datetime.now(KIEV_TZ)
+    now = clock.now()
     active_tasks_to_reschedule_count = 0
     for task_id, task_data in list(tasks_dict.items()):
         if task_data["status"] == "active":
@@ -675,14 +980,27 @@ async def on_startup():
     setup_scheduler()
     scheduler.start()
     logger.info("APScheduler запущен.")
+    if ADMIN_API_TOKEN:
+        try:
+            await start_admin_api()
+        except Exception as e:
+            logger.error(f"Не удалось запустить админ-API: {e}")
+    else:
+        logger.info("ADMIN_API_TOKEN не задан, админ-API выключено.")
     try:
-        manager_names_str = ", ".join(MANAGER_NAMES.values()) if MANAGER_NAMES else "менеджеры не настроены"
+        manager_names_str = html.escape(", ".join(MANAGER_NAMES.values())) if MANAGER_NAMES else "менеджеры не настроены"
         await bot.send_message(OWNER_ID, f"Бот успешно запущен! Активны менеджеры: {manager_names_str}.")
     except Exception as e:
         logger.error(f"Не удалось отправить сообщение о запуске владельцу: {e}")
 
+async def on_shutdown():
+    if admin_api_runner:
+        await admin_api_runner.cleanup()
+        logger.info("Админ-API остановлено.")
+
 async def main():
     dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
     await dp.start_polling(bot)
 
 if __name__ == "__main__":
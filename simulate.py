@@ -0,0 +1,271 @@
+"""
+Симуляция работы бота на ускоренных часах.
+
+Прогоняет пресеты CronTrigger, цикл check_tasks и 30-минутные напоминания
+за недели/месяцы за несколько секунд. Вместо Telegram используется FakeBot,
+который только считает сообщения. Задачи пишутся во временную БД (или в db_path), tasks.db не трогается.
+
+Пример:
+    python simulate.py --start 2028-02-01 --days 35 --ack-after 45
+
+Как и сам бот, требует заполненный API_TOKEN в bot.py (aiogram проверяет формат токена).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import bot as app
+
+
+class SimulatedClock:
+    """Часы, которые двигает только раннер симуляции."""
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance_to(self, moment: datetime):
+        if moment > self.current:
+            self.current = app.KIEV_TZ.normalize(moment)
+
+
+class FakeBot:
+    """Подмена aiogram.Bot: запоминает отправленные сообщения вместо похода в Telegram.
+
+    Каждый вызов API «занимает» latency секунд симулированного времени, как запрос к Telegram.
+    """
+    def __init__(self, clock: SimulatedClock, latency: float = 0.0):
+        self.clock = clock
+        self.latency = timedelta(seconds=latency)
+        self.sent = []
+        self.deleted = 0
+        self._next_message_id = 1
+
+    def _record(self, method: str, chat_id: int, reply_markup=None):
+        self.clock.advance_to(self.clock.now() + self.latency)
+        task_id = None
+        if reply_markup is not None:
+            callback_data = reply_markup.inline_keyboard[0][0].callback_data
+            if callback_data.startswith("done:"):
+                task_id = callback_data.split(":", 1)[1]
+        message = SimpleNamespace(message_id=self._next_message_id, chat_id=chat_id)
+        self._next_message_id += 1
+        self.sent.append(SimpleNamespace(method=method, chat_id=chat_id, task_id=task_id, at=self.clock.now()))
+        return message
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None, **kwargs):
+        return self._record("send_message", chat_id, reply_markup)
+
+    async def send_photo(self, chat_id: int, photo: str, caption: str = None, reply_markup=None, **kwargs):
+        return self._record("send_photo", chat_id, reply_markup)
+
+    async def send_document(self, chat_id: int, document: str, caption: str = None, reply_markup=None, **kwargs):
+        return self._record("send_document", chat_id, reply_markup)
+
+    async def send_video(self, chat_id: int, video: str, caption: str = None, reply_markup=None, **kwargs):
+        return self._record("send_video", chat_id, reply_markup)
+
+    async def delete_message(self, chat_id: int, message_id: int):
+        self.clock.advance_to(self.clock.now() + self.latency)
+        self.deleted += 1
+        return True
+
+
+class FakeCallbackQuery:
+    """Нажатие «Выполнено» менеджером для done_task_handler."""
+    def __init__(self, task_id: str, user_id: int):
+        self.data = f"done:{task_id}"
+        self.from_user = SimpleNamespace(id=user_id)
+        self.message = SimpleNamespace(delete=self._noop)
+
+    async def _noop(self):
+        return True
+
+    async def answer(self, *args, **kwargs):
+        return True
+
+
+def _percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def run_simulation(start: datetime, days: int, ack_after_minutes: int = None,
+                         check_offset: float = 17.0, latency: float = 0.3, db_path: str = None) -> dict:
+    """Прогоняет расписание от start на days дней и возвращает отчёт.
+
+    check_offset сдвигает сетку check_tasks относительно start: в проде интервальная задача
+    отсчитывается от момента запуска бота, а не от ровной минуты. Без db_path задачи пишутся
+    во временную БД. Состояние модуля bot восстанавливается после прогона.
+    """
+    saved_state = (app.clock, app.bot, app.DB_PATH, dict(app.tasks_dict))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        clock = SimulatedClock(start)
+        fake_bot = FakeBot(clock, latency)
+        app.clock = clock
+        app.bot = fake_bot
+        app.DB_PATH = db_path or os.path.join(tmp_dir, "simulation.db")
+        app.tasks_dict.clear()
+        try:
+            app.init_db()
+            return await _simulate(clock, fake_bot, start, days, ack_after_minutes, check_offset)
+        finally:
+            app.clock, app.bot, app.DB_PATH, saved_tasks = saved_state
+            app.tasks_dict.clear()
+            app.tasks_dict.update(saved_tasks)
+            app._tasks_query_cache.clear()
+
+
+async def _simulate(clock: SimulatedClock, fake_bot: FakeBot, start: datetime, days: int,
+                    ack_after_minutes: int, check_offset: float) -> dict:
+    end = start + timedelta(days=days)
+    tick = timedelta(seconds=app.CHECK_TASKS_INTERVAL_SECONDS)
+    grid_start = start + timedelta(seconds=check_offset)
+    cron_jobs = [[job_func, trigger, trigger.get_next_fire_time(None, start)]
+                 for job_func, trigger in app.get_cron_jobs()]
+    pending_acks = {}
+    acked_or_planned = set()
+    seen_messages = 0
+    created_by_source = Counter()
+    lags = []
+    bursts = []
+    cycle_wall_times = []
+    check_cycles = 0
+    last_check = grid_start - tick
+
+    def collect_lags(first_message: int, due: dict):
+        for message in fake_bot.sent[first_message:]:
+            if message.task_id in due:
+                lags.append((message.at - due[message.task_id]).total_seconds())
+        bursts.append(len(fake_bot.sent) - first_message)
+
+    while True:
+        # Пустые тики check_tasks пропускаем: ближайший тик сетки после последней проверки, но не раньше дедлайна
+        candidates = [fire_time for _, _, fire_time in cron_jobs if fire_time] + list(pending_acks.values())
+        deadlines = [task["deadline"] for task in app.tasks_dict.values()
+                     if task["status"] == "active" and task["deadline"]]
+        next_check = None
+        if deadlines:
+            earliest = max(min(deadlines), last_check + tick, clock.now())
+            next_check = grid_start + tick * -(-(earliest - grid_start) // tick)
+            candidates.append(next_check)
+        if not candidates:
+            break
+        moment = min(candidates)
+        if moment >= end:
+            break
+        clock.advance_to(moment)
+
+        for task_id, ack_at in list(pending_acks.items()):
+            if ack_at <= moment:
+                del pending_acks[task_id]
+                task = app.tasks_dict.get(task_id)
+                if task:
+                    await app.done_task_handler(FakeCallbackQuery(task_id, task["chat_id"]))
+
+        for job in cron_jobs:
+            job_func, trigger, fire_time = job
+            if fire_time and fire_time <= moment:
+                known_tasks = set(app.tasks_dict)
+                first_message = len(fake_bot.sent)
+                await job_func()
+                new_tasks = set(app.tasks_dict) - known_tasks
+                for task_id in new_tasks:
+                    created_by_source[app.tasks_dict[task_id]["source"]] += 1
+                collect_lags(first_message, {task_id: fire_time for task_id in new_tasks})
+                job[2] = trigger.get_next_fire_time(fire_time, fire_time + timedelta(seconds=1))
+
+        if next_check is not None and next_check <= moment:
+            cycle_started_at = clock.now()
+            due = {task_id: task["deadline"] for task_id, task in app.tasks_dict.items()
+                   if task["status"] == "active" and task["deadline"] and task["deadline"] <= cycle_started_at}
+            first_message = len(fake_bot.sent)
+            started = time.perf_counter()
+            await app.check_tasks()
+            cycle_wall_times.append(time.perf_counter() - started)
+            check_cycles += 1
+            collect_lags(first_message, due)
+            last_check = moment
+
+        if ack_after_minutes is not None:
+            for message in fake_bot.sent[seen_messages:]:
+                if message.task_id and message.task_id not in acked_or_planned:
+                    acked_or_planned.add(message.task_id)
+                    pending_acks[message.task_id] = message.at + timedelta(minutes=ack_after_minutes)
+        seen_messages = len(fake_bot.sent)
+
+    messages_by_day = Counter(message.at.date() for message in fake_bot.sent)
+    messages_by_second = Counter(message.at.replace(microsecond=0) for message in fake_bot.sent)
+    return {
+        "period": f"{start:%d.%m.%Y %H:%M} — {end:%d.%m.%Y %H:%M} ({days} дн.)",
+        "tasks_created": dict(created_by_source),
+        "messages_total": len(fake_bot.sent),
+        "messages_by_method": dict(Counter(message.method for message in fake_bot.sent)),
+        "messages_by_chat": dict(Counter(message.chat_id for message in fake_bot.sent)),
+        "owner_notifications": sum(1 for message in fake_bot.sent if message.chat_id == app.OWNER_ID),
+        "deleted_messages": fake_bot.deleted,
+        "peak_day": messages_by_day.most_common(1)[0] if messages_by_day else None,
+        "max_burst_per_cycle": max(bursts, default=0),
+        "max_per_second": max(messages_by_second.values(), default=0),
+        "still_active": sum(1 for task in app.tasks_dict.values() if task["status"] == "active"),
+        "check_cycles": check_cycles,
+        "lag_seconds": {
+            "avg": sum(lags) / len(lags) if lags else 0.0,
+            "p95": _percentile(lags, 0.95),
+            "max": max(lags, default=0.0),
+        },
+        "cycle_wall_ms": {
+            "avg": 1000 * sum(cycle_wall_times) / len(cycle_wall_times) if cycle_wall_times else 0.0,
+            "max": 1000 * max(cycle_wall_times, default=0.0),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ускоренная симуляция расписания бота.")
+    parser.add_argument("--start", default=datetime.now(app.KIEV_TZ).strftime("%Y-%m-%d"),
+                        help="Дата начала в формате YYYY-MM-DD (время 00:00 по Киеву).")
+    parser.add_argument("--days", type=int, default=31, help="Сколько дней прогнать.")
+    parser.add_argument("--ack-after", type=int, default=45,
+                        help="Через сколько минут после первого сообщения менеджер жмёт «Выполнено».")
+    parser.add_argument("--no-ack", action="store_true", help="Менеджеры никогда не жмут «Выполнено».")
+    parser.add_argument("--check-offset", type=float, default=17.0,
+                        help="Сдвиг сетки check_tasks от начала, с (в проде — момент запуска бота).")
+    parser.add_argument("--latency", type=float, default=0.3, help="Время одного запроса к Telegram API, с.")
+    args = parser.parse_args()
+
+    start = app.KIEV_TZ.localize(datetime.strptime(args.start, "%Y-%m-%d"))
+    logging.getLogger(app.__name__).setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    report = asyncio.run(run_simulation(start, args.days, None if args.no_ack else args.ack_after,
+                                        args.check_offset, args.latency))
+    elapsed = time.perf_counter() - started
+
+    print(f"Симуляция: {report['period']}, заняла {elapsed:.2f} с")
+    print(f"Создано задач по источникам: {report['tasks_created']}")
+    print(f"Отправлено сообщений: {report['messages_total']} {report['messages_by_method']}")
+    print(f"По чатам: {report['messages_by_chat']}")
+    print(f"Уведомлений владельцу: {report['owner_notifications']}, удалено сообщений: {report['deleted_messages']}")
+    if report["peak_day"]:
+        print(f"Пиковый день: {report['peak_day'][0]:%d.%m.%Y} — {report['peak_day'][1]} сообщений")
+    print(f"Максимум сообщений за цикл: {report['max_burst_per_cycle']}, за секунду: {report['max_per_second']}")
+    print(f"Активных задач на конец: {report['still_active']}, циклов check_tasks: {report['check_cycles']}")
+    lag = report["lag_seconds"]
+    print(f"Задержка напоминаний, с: avg {lag['avg']:.1f}, p95 {lag['p95']:.1f}, max {lag['max']:.1f}")
+    wall = report["cycle_wall_ms"]
+    print(f"Время цикла check_tasks, мс: avg {wall['avg']:.2f}, max {wall['max']:.2f}")
+
+
+if __name__ == "__main__":
+    main()